@@ -1,5 +1,14 @@
 #!/usr/bin/env python3
-from flask import Flask, jsonify, request
+import json
+import os
+
+if __name__ == "__main__":
+    # the app.run(debug=True) at the bottom enables debug too late for
+    # import-time decisions (models pick lazy='raise' from the environment),
+    # so export it before models are imported
+    os.environ.setdefault("FLASK_DEBUG", "1")
+
+from flask import Flask, jsonify, request, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
@@ -8,10 +17,27 @@ from models import db, User, Rating
 
 from config import Config
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload, undefer
 from datetime import timedelta
 
 migrate = Migrate()
 
+# in-process memo of serialized providers, keyed on the denormalized rating
+# counters so any scored rating write naturally invalidates the entry; writes
+# that leave the counters untouched (comment-only edits) evict explicitly
+_provider_cache = {}
+
+
+def serialize_provider(provider):
+    key = (provider.rating_sum, provider.rating_count)
+    cached = _provider_cache.get(provider.id)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    data = provider.to_dict()
+    _provider_cache[provider.id] = (key, data)
+    return data
+
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
@@ -44,9 +70,6 @@ def create_app():
         if not name or not email or not password or not role:
             return jsonify({"error": "name, email, password and role are required"}), 400
 
-        if role not in ["provider", "client"]:
-            return jsonify({"error": "Invalid role. Must be 'provider' or 'client'"}), 400
-
         if role not in ["client", "provider"]:
             return jsonify({"error": "role must be either 'client' or 'provider'"}), 400
 
@@ -79,7 +102,11 @@ def create_app():
         if not email or not password:
             return jsonify({"error": "email and password are required"}), 400
 
-        user = User.query.filter_by(email=email.lower().strip()).first()
+        user = (
+            User.query.filter_by(email=email.lower().strip())
+            .options(undefer(User.password_hash))
+            .first()
+        )
         if not user or not user.check_password(password):
             return jsonify({"error": "invalid credentials"}), 401
 
@@ -124,21 +151,79 @@ def create_app():
         service_type = request.args.get("service_type", type=str)
         location = request.args.get("location", type=str)
 
-        query = User.query.filter_by(role="provider")
+        # one query: the database builds each provider's review array with
+        # JSON1 aggregates (SQLite's json_group_array/json_object, the
+        # equivalent of Postgres json_agg/json_build_object), so no Rating
+        # ORM objects are materialized at all; reviewer_name is denormalized
+        # on ratings, so no join back to users is needed for the rater
+        reviews_json = (
+            func.json_group_array(
+                func.json_object(
+                    "id", Rating.id,
+                    "score", Rating.score,
+                    "comment", Rating.comment,
+                    "provider_id", Rating.provider_id,
+                    "user_id", Rating.user_id,
+                    "user", Rating.reviewer_name,
+                )
+            )
+            .filter(Rating.id.isnot(None))
+            .label("reviews")
+        )
+
+        stmt = (
+            select(
+                User.id, User.name, User.email, User.role,
+                User.service_type, User.location, User.phone,
+                User.rating_sum, User.rating_count,
+                reviews_json,
+            )
+            .outerjoin(Rating, Rating.provider_id == User.id)
+            .where(User.role == "provider")
+            .group_by(User.id)
+        )
 
         if service_type:
-            query = query.filter(User.service_type.ilike(f"%{service_type}%"))
+            stmt = stmt.where(User.service_type.ilike(f"%{service_type}%"))
         if location:
-            query = query.filter(User.location.ilike(f"%{location}%"))
-
-        providers = query.all()
-        return jsonify([p.to_dict() for p in providers]), 200
+            stmt = stmt.where(User.location.ilike(f"%{location}%"))
+
+        # stream the response: rows are fetched in yield_per chunks and each
+        # is serialized and flushed as it arrives, so neither the result set
+        # nor the JSON body is ever held in memory whole
+        def generate():
+            yield "["
+            first = True
+            for row in db.session.execute(stmt.execution_options(yield_per=500)):
+                provider = {
+                    "id": row.id,
+                    "name": row.name,
+                    "email": row.email,
+                    "role": row.role,
+                    "service_type": row.service_type,
+                    "location": row.location,
+                    "phone": row.phone,
+                    "rating": round(row.rating_sum / row.rating_count, 1) if row.rating_count else 0,
+                    "reviews": json.loads(row.reviews) if row.reviews else [],
+                }
+                yield ("" if first else ",") + json.dumps(provider)
+                first = False
+            yield "]"
+
+        # stream_with_context keeps the request/app context (and the session)
+        # alive until the generator is exhausted
+        return app.response_class(stream_with_context(generate()), mimetype="application/json")
 
 
     @app.route("/providers/<int:id>", methods=["GET"])
     def get_provider(id):
-        provider = User.query.filter_by(id=id, role="provider").first_or_404()
-        return jsonify(provider.to_dict()), 200
+        # reviewer_name is denormalized on ratings, so no rater join is needed
+        provider = (
+            User.query.filter_by(id=id, role="provider")
+            .options(selectinload(User.ratings_received))
+            .first_or_404()
+        )
+        return jsonify(serialize_provider(provider)), 200
 
     # RATING 
     @app.route("/providers/<int:id>/rating", methods=["POST"])
@@ -173,6 +258,7 @@ def create_app():
             db.session.add(new_rating)
 
         db.session.commit()
+        _provider_cache.pop(provider.id, None)
 
         return jsonify({"message": "Rating submitted"}), 201
 
@@ -6,4 +6,10 @@ load_dotenv()
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # room for every route's statement variants so repeated short queries
+    # skip SQL compilation (default cache size is 500)
+    SQLALCHEMY_ENGINE_OPTIONS = {"query_cache_size": 1200}
     SECRET_KEY = os.getenv("SECRET_KEY")
+    # optional override for werkzeug's generate_password_hash method string;
+    # leave unset in prod, set a low-iteration method for dev/CI/seeding
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD")
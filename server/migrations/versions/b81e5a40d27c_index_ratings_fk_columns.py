@@ -0,0 +1,26 @@
+"""Index ratings FK columns
+
+Revision ID: b81e5a40d27c
+Revises: f7d3b92c14ae
+Create Date: 2026-09-01 09:41:07.552810
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81e5a40d27c'
+down_revision = 'f7d3b92c14ae'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_ratings_provider_id', 'ratings', ['provider_id'], unique=False)
+    op.create_index('ix_ratings_user_id', 'ratings', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_ratings_user_id', table_name='ratings')
+    op.drop_index('ix_ratings_provider_id', table_name='ratings')
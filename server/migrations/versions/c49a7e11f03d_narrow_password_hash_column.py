@@ -0,0 +1,32 @@
+"""Narrow password_hash column
+
+Revision ID: c49a7e11f03d
+Revises: b81e5a40d27c
+Create Date: 2026-09-01 10:27:49.106532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c49a7e11f03d'
+down_revision = 'b81e5a40d27c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('password_hash',
+                              existing_type=sa.String(length=255),
+                              type_=sa.String(length=180),
+                              existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('password_hash',
+                              existing_type=sa.String(length=180),
+                              type_=sa.String(length=255),
+                              existing_nullable=False)
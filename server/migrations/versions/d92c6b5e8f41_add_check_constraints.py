@@ -0,0 +1,37 @@
+"""Add check constraints for role, email, phone and score
+
+Revision ID: d92c6b5e8f41
+Revises: c49a7e11f03d
+Create Date: 2026-09-01 11:05:22.871946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd92c6b5e8f41'
+down_revision = 'c49a7e11f03d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.create_check_constraint('ck_users_role', "role IN ('client', 'provider')")
+        batch_op.create_check_constraint('ck_users_email', "email LIKE '%@%'")
+        batch_op.create_check_constraint('ck_users_provider_phone',
+                                         "role <> 'provider' OR (phone IS NOT NULL AND length(trim(phone)) >= 9)")
+
+    with op.batch_alter_table('ratings') as batch_op:
+        batch_op.create_check_constraint('ck_ratings_score', "score BETWEEN 1 AND 5")
+
+
+def downgrade():
+    with op.batch_alter_table('ratings') as batch_op:
+        batch_op.drop_constraint('ck_ratings_score', type_='check')
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_constraint('ck_users_provider_phone', type_='check')
+        batch_op.drop_constraint('ck_users_email', type_='check')
+        batch_op.drop_constraint('ck_users_role', type_='check')
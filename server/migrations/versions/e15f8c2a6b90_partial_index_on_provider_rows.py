@@ -0,0 +1,27 @@
+"""Partial index on provider rows
+
+Revision ID: e15f8c2a6b90
+Revises: d92c6b5e8f41
+Create Date: 2026-09-01 11:32:40.293518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e15f8c2a6b90'
+down_revision = 'd92c6b5e8f41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_providers', 'users', ['service_type', 'location'],
+                    unique=False,
+                    sqlite_where=sa.text("role = 'provider'"),
+                    postgresql_where=sa.text("role = 'provider'"))
+
+
+def downgrade():
+    op.drop_index('ix_users_providers', table_name='users')
@@ -0,0 +1,29 @@
+"""Snapshot reviewer name on ratings
+
+Revision ID: f3a9d07c5e28
+Revises: e15f8c2a6b90
+Create Date: 2026-09-01 12:01:17.664203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9d07c5e28'
+down_revision = 'e15f8c2a6b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('ratings', sa.Column('reviewer_name', sa.String(length=120), nullable=True))
+    # backfill from the current rater names
+    op.execute(
+        "UPDATE ratings SET reviewer_name = "
+        "(SELECT name FROM users WHERE users.id = ratings.user_id)"
+    )
+
+
+def downgrade():
+    op.drop_column('ratings', 'reviewer_name')
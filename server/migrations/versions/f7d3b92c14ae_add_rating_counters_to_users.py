@@ -0,0 +1,32 @@
+"""Add denormalized rating counters to users
+
+Revision ID: f7d3b92c14ae
+Revises: cec5867bfbf2
+Create Date: 2026-09-01 09:12:33.418275
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7d3b92c14ae'
+down_revision = 'cec5867bfbf2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('users', sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'))
+    # backfill from existing ratings so the counters start out consistent
+    op.execute(
+        "UPDATE users SET "
+        "rating_sum = COALESCE((SELECT SUM(score) FROM ratings WHERE ratings.provider_id = users.id), 0), "
+        "rating_count = (SELECT COUNT(*) FROM ratings WHERE ratings.provider_id = users.id)"
+    )
+
+
+def downgrade():
+    op.drop_column('users', 'rating_count')
+    op.drop_column('users', 'rating_sum')
@@ -1,17 +1,46 @@
+import os
+
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import validates
+from sqlalchemy import event, func, select
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 
 db = SQLAlchemy()
 
+# request code never traverses the write-side relationships (ratings_given,
+# Rating.user/provider), so outside production they raise on lazy access and
+# an accidental N+1 fails fast. Loader strategy is fixed when the relationship
+# is defined — before app config exists — so this reads the environment
+# (flask run --debug exports FLASK_DEBUG; TESTING covers test runs).
+_DEV = os.getenv("FLASK_DEBUG", "").lower() not in ("", "0", "false") or bool(os.getenv("TESTING"))
+_WRITE_SIDE_LAZY = "raise" if _DEV else "select"
+
 class User(db.Model):
     __tablename__ = "users"
 
+    # invariants live in the schema so they hold for every write path
+    # (ORM, Core bulk inserts, manual SQL) at no per-assignment Python cost
+    __table_args__ = (
+        db.CheckConstraint("role IN ('client', 'provider')", name="ck_users_role"),
+        db.CheckConstraint("email LIKE '%@%'", name="ck_users_email"),
+        # the explicit NULL test matters: a NULL phone would make the length
+        # comparison NULL, which CHECK treats as a pass
+        db.CheckConstraint("role <> 'provider' OR (phone IS NOT NULL AND length(trim(phone)) >= 9)",
+                           name="ck_users_provider_phone"),
+        # partial index so provider listings scan only provider rows; the
+        # service columns are NULL for every client and never queried there
+        db.Index("ix_users_providers", "service_type", "location",
+                 sqlite_where=db.text("role = 'provider'"),
+                 postgresql_where=db.text("role = 'provider'")),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(255), nullable=False)
+    # sized for werkzeug's output: scrypt is 162 chars, pbkdf2:sha256 ~102;
+    # deferred so listings never fetch the hash — login undefers explicitly
+    password_hash = db.deferred(db.Column(db.String(180), nullable=False))
 
     role = db.Column(db.String(20), nullable=False)  # "client" or "provider"
 
@@ -20,49 +49,44 @@ class User(db.Model):
     location = db.Column(db.String(120), nullable=True)
     phone = db.Column(db.String(30), nullable=True)
 
+    # denormalized rating aggregates, maintained by the Rating events below
+    # so the average never has to load the full ratings collection
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     # ✅ specify foreign key to remove ambiguity
     ratings_given = db.relationship(
         "Rating",
         foreign_keys="Rating.user_id",
         back_populates="user",
-        lazy=True
+        lazy=_WRITE_SIDE_LAZY
     )
 
+    # selectin: fetch all ratings for the loaded users in one IN-list query
+    # instead of one lazy SELECT per provider when to_dict touches them
     ratings_received = db.relationship(
         "Rating",
         foreign_keys="Rating.provider_id",
         back_populates="provider",
-        lazy=True
+        lazy="selectin"
     )
 
-    def set_password(self, password):
+    def set_password(self, password, method=None):
         if len(password) < 6:
             raise ValueError("Password must be at least 6 characters.")
-        self.password_hash = generate_password_hash(password)
+        # dev/test/seed environments can set PASSWORD_HASH_METHOD to a cheap
+        # KDF (e.g. "pbkdf2:sha256:1000"); prod keeps werkzeug's default cost
+        if method is None and has_app_context():
+            method = current_app.config.get("PASSWORD_HASH_METHOD")
+        if method:
+            self.password_hash = generate_password_hash(password, method=method)
+        else:
+            self.password_hash = generate_password_hash(password)
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
-    @validates("role")
-    def validate_role(self, key, value):
-        roles = ["client", "provider"]
-        if value not in roles:
-            raise ValueError(f"Role must be one of {roles}")
-        return value
-
-    @validates("email")
-    def validate_email(self, key, value):
-        if "@" not in value:
-            raise ValueError("Invalid email format")
-        return value
-
-    @validates("phone")
-    def validate_phone(self, key, value):
-        if self.role == "provider" and (value is None or len(value.strip()) < 9):
-            raise ValueError("Service providers must have a valid phone number")
-        return value
-
-    def to_dict(self):
+    def to_dict(self, avg=None, count=None):
         data = {
             "id": self.id,
             "name": self.name,
@@ -71,11 +95,18 @@ class User(db.Model):
         }
 
         if self.role == "provider":
+            # callers that already computed the aggregate in SQL (e.g. a bulk
+            # AVG/COUNT over a listing) can pass it in to skip the column read
+            if avg is not None:
+                rating = round(avg, 1) if count else 0
+            else:
+                rating = self.rating
+
             data.update({
                 "service_type": self.service_type,
                 "location": self.location,
                 "phone": self.phone,
-                "rating": self.rating,
+                "rating": rating,
                 "reviews": [review.to_dict() for review in self.ratings_received]
             })
 
@@ -83,15 +114,37 @@ class User(db.Model):
 
     @property
     def rating(self):
-        if len(self.ratings_received) == 0:
+        if not self.rating_count:
             return 0
-        total = sum([r.score for r in self.ratings_received])
-        return round(total / len(self.ratings_received), 1)
+        return round(self.rating_sum / self.rating_count, 1)
+
+    def recalculate_rating(self):
+        """Recompute the denormalized counters from the ratings table.
+
+        One scalar aggregate query — no Rating rows are materialized.
+        Meant for writes that bypass the Rating events (bulk imports,
+        manual fixes).
+        """
+        total, count = (
+            db.session.query(func.coalesce(func.sum(Rating.score), 0), func.count(Rating.id))
+            .filter(Rating.provider_id == self.id)
+            .one()
+        )
+        self.rating_sum = total
+        self.rating_count = count
 
 
 class Rating(db.Model):
     __tablename__ = "ratings"
 
+    # FKs get no secondary index automatically; both columns are filtered on
+    # every provider page / user-activity lookup
+    __table_args__ = (
+        db.Index("ix_ratings_provider_id", "provider_id"),
+        db.Index("ix_ratings_user_id", "user_id"),
+        db.CheckConstraint("score BETWEEN 1 AND 5", name="ck_ratings_score"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     provider_id = db.Column(db.Integer, db.ForeignKey("users.id"))
@@ -100,25 +153,25 @@ class Rating(db.Model):
     score = db.Column(db.Integer, nullable=False)
     comment = db.Column(db.Text)
 
+    # snapshot of the rater's name taken at insert (and refreshed when the
+    # user renames) so serialization never touches the user relationship
+    reviewer_name = db.Column(db.String(120))
+
     # ✅ explicit relationship definitions
     user = db.relationship(
         "User",
         foreign_keys=[user_id],
-        back_populates="ratings_given"
+        back_populates="ratings_given",
+        lazy=_WRITE_SIDE_LAZY
     )
 
     provider = db.relationship(
         "User",
         foreign_keys=[provider_id],
-        back_populates="ratings_received"
+        back_populates="ratings_received",
+        lazy=_WRITE_SIDE_LAZY
     )
 
-    @validates("score")
-    def validate_score(self, key, value):
-        if value < 1 or value > 5:
-            raise ValueError("Rating must be between 1 and 5")
-        return value
-
     def to_dict(self):
         return {
             "id": self.id,
@@ -126,9 +179,67 @@ class Rating(db.Model):
             "comment": self.comment,
             "provider_id": self.provider_id,
             "user_id": self.user_id,
-            "user": self.user.name if self.user else None
+            "user": self.reviewer_name
         }
-    
+
+
+def _apply_rating_delta(connection, provider_id, score_delta, count_delta):
+    """Atomically adjust the denormalized counters on the provider row."""
+    if provider_id is None:
+        return
+    connection.execute(
+        User.__table__.update()
+        .where(User.__table__.c.id == provider_id)
+        .values(
+            rating_sum=User.__table__.c.rating_sum + score_delta,
+            rating_count=User.__table__.c.rating_count + count_delta,
+        )
+    )
+
+
+@event.listens_for(Rating, "before_insert")
+def _rating_snapshot_reviewer(mapper, connection, target):
+    if target.reviewer_name is None and target.user_id is not None:
+        target.reviewer_name = connection.execute(
+            select(User.__table__.c.name).where(User.__table__.c.id == target.user_id)
+        ).scalar()
+
+
+@event.listens_for(Rating, "after_insert")
+def _rating_inserted(mapper, connection, target):
+    _apply_rating_delta(connection, target.provider_id, target.score, 1)
+
+
+@event.listens_for(Rating, "after_update")
+def _rating_updated(mapper, connection, target):
+    # the delta needs the old score, so history.deleted is required here; it
+    # is empty if score is assigned while the attribute is expired, in which
+    # case the adjustment is skipped and the counters drift. In-app writes
+    # always load the rating first, so that can't happen today — run
+    # User.recalculate_rating() after any write path that doesn't.
+    history = db.inspect(target).attrs.score.history
+    if history.has_changes() and history.deleted:
+        _apply_rating_delta(connection, target.provider_id, target.score - history.deleted[0], 0)
+
+
+@event.listens_for(Rating, "after_delete")
+def _rating_deleted(mapper, connection, target):
+    _apply_rating_delta(connection, target.provider_id, -target.score, -1)
+
+
+@event.listens_for(User, "after_update")
+def _user_renamed(mapper, connection, target):
+    # history.deleted is empty when name was assigned while expired/unloaded,
+    # so gate on has_changes() alone — the propagation UPDATE is idempotent
+    history = db.inspect(target).attrs.name.history
+    if history.has_changes():
+        connection.execute(
+            Rating.__table__.update()
+            .where(Rating.__table__.c.user_id == target.id)
+            .values(reviewer_name=target.name)
+        )
+
+
 class Notification(db.Model):
     __tablename__ = "notifications"
 
@@ -1,84 +1,102 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import sqlalchemy as sa
+from werkzeug.security import generate_password_hash
+
 from app import app
 from models import db, User, Rating
 
-with app.app_context():
-
-    print("Dropping existing tables...")
-    db.drop_all()
-
-    print("Creating new tables...")
-    db.create_all()
-
-    print("Seeding Users (Clients)...")
-
-    user1 = User(name="Alice Johnson", email="alice@example.com", role="client")
-    user1.set_password("alice123")
-
-    user2 = User(name="Brian Kim", email="brian@example.com", role="client")
-    user2.set_password("brian123")
-
-    user3 = User(name="Chanel Amani", email="chanel@example.com", role="client")
-    user3.set_password("chanel123")
-
-    print("Seeding Users (Service Providers)...")
-
-    provider1 = User(
-        name="FixIt Plumbing Co.",
-        email="fixit@example.com",
-        role="provider",
-        service_type="Plumbing",
-        location="Nairobi",
-        phone="0700123456"
-    )
-    provider1.set_password("fixit123")
-
-    provider2 = User(
-        name="Spark Electricals",
-        email="spark@example.com",
-        role="provider",
-        service_type="Electrical",
-        location="Thika",
-        phone="0712345678"
-    )
-    provider2.set_password("spark123")
-
-    provider3 = User(
-        name="CleanSweep Services",
-        email="cleansweep@example.com",
-        role="provider",
-        service_type="Cleaning",
-        location="Westlands",
-        phone="0798765432"
-    )
-    provider3.set_password("clean123")
-
-    db.session.add_all([user1, user2, user3, provider1, provider2, provider3])
-    db.session.commit()
-
-    print("Seeding Ratings...")
-
-    rating1 = Rating(
-        score=5,
-        comment="They fixed my sink very fast! Highly recommended.",
-        provider_id=provider1.id,
-        user_id=user1.id
-    )
-
-    rating2 = Rating(
-        score=4,
-        comment="Good service but was slightly late.",
-        provider_id=provider1.id,
-        user_id=user2.id
-    )
-
-    rating3 = Rating(
-        score=3,
-        comment="Affordable but could improve on communication.",
-        provider_id=provider3.id,
-        user_id=user3.id
-    )
-
-    db.session.add_all([rating1, rating2, rating3])
-    db.session.commit()
-
-    print("✅ Database seeding completed successfully!")
+# seed data doesn't need a slow KDF; a cheap method keeps the script fast
+SEED_HASH_METHOD = "pbkdf2:sha256:1000"
+
+USERS = [
+    {"name": "Alice Johnson", "email": "alice@example.com", "role": "client",
+     "service_type": None, "location": None, "phone": None, "password": "alice123"},
+    {"name": "Brian Kim", "email": "brian@example.com", "role": "client",
+     "service_type": None, "location": None, "phone": None, "password": "brian123"},
+    {"name": "Chanel Amani", "email": "chanel@example.com", "role": "client",
+     "service_type": None, "location": None, "phone": None, "password": "chanel123"},
+    {"name": "FixIt Plumbing Co.", "email": "fixit@example.com", "role": "provider",
+     "service_type": "Plumbing", "location": "Nairobi", "phone": "0700123456", "password": "fixit123"},
+    {"name": "Spark Electricals", "email": "spark@example.com", "role": "provider",
+     "service_type": "Electrical", "location": "Thika", "phone": "0712345678", "password": "spark123"},
+    {"name": "CleanSweep Services", "email": "cleansweep@example.com", "role": "provider",
+     "service_type": "Cleaning", "location": "Westlands", "phone": "0798765432", "password": "clean123"},
+]
+
+RATINGS = [
+    {"score": 5, "comment": "They fixed my sink very fast! Highly recommended.",
+     "provider": "fixit@example.com", "user": "alice@example.com"},
+    {"score": 4, "comment": "Good service but was slightly late.",
+     "provider": "fixit@example.com", "user": "brian@example.com"},
+    {"score": 3, "comment": "Affordable but could improve on communication.",
+     "provider": "cleansweep@example.com", "user": "chanel@example.com"},
+]
+
+def seed():
+    with app.app_context():
+
+        print("Dropping existing tables...")
+        db.drop_all()
+
+        print("Creating new tables...")
+        db.create_all()
+
+        print("Seeding Users...")
+
+        # hashing is CPU-bound and each password is independent, so fan the KDF
+        # out across cores instead of running the hashes serially
+        passwords = [entry["password"] for entry in USERS]
+        for password in passwords:
+            if len(password) < 6:
+                raise ValueError("Password must be at least 6 characters.")
+
+        with ProcessPoolExecutor() as pool:
+            hashes = list(pool.map(partial(generate_password_hash, method=SEED_HASH_METHOD), passwords))
+
+        # insert all rows in one executemany instead of per-instance add_all
+        # unit-of-work inserts
+        user_rows = []
+        for entry, password_hash in zip(USERS, hashes):
+            row = dict(entry)
+            del row["password"]
+            row["password_hash"] = password_hash
+            user_rows.append(row)
+
+        # Core table insert: one executemany, no unit-of-work, identity map or
+        # ORM validator/event machinery in the loop
+        db.session.execute(User.__table__.insert(), user_rows)
+
+        ids_by_email = dict(db.session.execute(sa.select(User.email, User.id)).all())
+
+        print("Seeding Ratings...")
+
+        names_by_email = {entry["email"]: entry["name"] for entry in USERS}
+
+        rating_rows = [
+            {"score": r["score"], "comment": r["comment"],
+             "provider_id": ids_by_email[r["provider"]], "user_id": ids_by_email[r["user"]],
+             "reviewer_name": names_by_email[r["user"]]}
+            for r in RATINGS
+        ]
+
+        db.session.execute(Rating.__table__.insert(), rating_rows)
+
+        # bulk inserts bypass the Rating ORM events, so refresh the denormalized
+        # counters the same way the migration backfill does
+        db.session.execute(sa.text(
+            "UPDATE users SET "
+            "rating_sum = COALESCE((SELECT SUM(score) FROM ratings WHERE ratings.provider_id = users.id), 0), "
+            "rating_count = (SELECT COUNT(*) FROM ratings WHERE ratings.provider_id = users.id)"
+        ))
+
+        db.session.commit()
+
+        print("✅ Database seeding completed successfully!")
+
+
+# the guard matters: on spawn-start platforms (macOS/Windows) each pool worker
+# re-imports this module, and an unguarded body would re-run drop_all
+if __name__ == "__main__":
+    seed()